@@ -2,9 +2,33 @@
 #
 # SPDX-License-Identifier: MIT
 
+import os
 import re
+import hashlib
 import logging
-from typing import Optional, List, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Patterns used on every translated page, compiled once at import time
+_HEADING_RE = re.compile(r"(^# .+\n)", re.MULTILINE)
+_FRONTMATTER_RE = re.compile(r"^(---\n.*?\n---\n)", re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r"```[a-z]*\n[\s\S]*?\n```")
+# Markdown elements compared by the integrity check, matched in one pass.
+# The group names are used to tell the matched elements apart. Links use
+# negated character classes bound to a single line instead of lazy `.+?`
+# quantifiers, which avoids backtracking on long lines.
+_INTEGRITY_RE = re.compile(
+    r"(?P<headers>^#+\s)|(?P<code_blocks>```)|(?P<links>\[[^\]\n]+\]\([^)\n]+\))",
+    re.MULTILINE,
+)
+_PLACEHOLDER_RE = re.compile(r"CODEBLOCK_(\d+)_PLACEHOLDER")
+
+# Markdown element counts of source contents, keyed by content digest. Every
+# source file is finalized once per target language, but scanned only once.
+_source_elements_cache: Dict[bytes, Dict[str, int]] = {}
+_SOURCE_ELEMENTS_CACHE_SIZE = 256
 
 
 notice_formats = {
@@ -13,6 +37,48 @@ notice_formats = {
 }
 
 
+def iter_source_files(root: Path, suffix: str) -> Iterator[Path]:
+    """
+    Yield all files below root whose name ends with the given suffix.
+
+    Filenames are tested as plain strings while walking the directory tree,
+    so Path objects are only created for matching files.
+    """
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(suffix):
+                yield Path(dirpath, filename)
+
+
+def read_markdown(filepath: Path) -> str:
+    """
+    Read a UTF-8 encoded markdown file.
+
+    Decodes the raw bytes in one go instead of using a text mode file. Windows
+    line endings are normalized, since all patterns in this module expect "\\n".
+    """
+    content = filepath.read_bytes().decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n")
+    return content
+
+
+def write_markdown(filepath: Path, content: str) -> None:
+    """
+    Write markdown content to a UTF-8 encoded file.
+    """
+    filepath.write_bytes(content.encode("utf-8"))
+
+
+@lru_cache(maxsize=32)
+def _translation_notice(theme_name: str, source_lang: str, target_lang: str) -> str:
+    """
+    Render the translation notice once per theme and language pair.
+    """
+    notice_format = notice_formats.get(theme_name, notice_formats["default"])
+    return notice_format.format(source_lang=source_lang, target_lang=target_lang)
+
+
 def add_translation_notice(
     content: str, source_lang: str, target_lang: str, theme_name: str
 ) -> str:
@@ -20,94 +86,192 @@ def add_translation_notice(
     Add a translation notice to the markdown content after first level 1 header.
     """
 
-    notice_format = notice_formats.get(theme_name, notice_formats["default"])
-    translation_notice = notice_format.format(
-        source_lang=source_lang.upper(), target_lang=target_lang.upper()
+    translation_notice = _translation_notice(
+        theme_name, source_lang.upper(), target_lang.upper()
     )
 
+    heading_match = _HEADING_RE.search(content)
+    heading_end = heading_match.end(1) if heading_match else None
+    return _insert_translation_notice(content, translation_notice, heading_end)
+
+
+def _insert_translation_notice(
+    content: str, translation_notice: str, heading_end: Optional[int]
+) -> str:
+    """
+    Insert the translation notice at the position given by the end of the first
+    level 1 heading, falling back to after the frontmatter or the very top.
+    """
     # 1. Insert after the first level 1 heading (anywhere in the file)
-    heading_match = re.search(r"(^# .+\n)", content, re.MULTILINE)
-    if heading_match:
-        end = heading_match.end(1)
-        return content[:end] + translation_notice + content[end:]
+    if heading_end is not None:
+        return "".join(
+            (content[:heading_end], translation_notice, content[heading_end:])
+        )
 
     # 2. If no heading, but frontmatter at the start, insert after frontmatter
-    frontmatter_match = re.match(r"^(---\n.*?\n---\n)", content, re.DOTALL)
+    frontmatter_match = _FRONTMATTER_RE.match(content)
     if frontmatter_match:
-        frontmatter = frontmatter_match.group(1)
-        rest = content[len(frontmatter) :]
-        return frontmatter + translation_notice + rest
+        end = frontmatter_match.end(1)
+        return "".join((content[:end], translation_notice, content[end:]))
 
     # 3. Otherwise, insert at the very top
     return translation_notice + content
 
 
-def code_block_transform(
-    content: str, code_blocks: Optional[list[str]] = None, mode: str = "protect"
-) -> str | tuple[str, list[str]]:
+def protect_code_blocks(content: str) -> Tuple[str, List[str]]:
     """
-    Protect or restore code blocks in markdown content.
+    Replace code blocks in markdown with placeholders.
+    Returns the modified content and a list of code blocks.
+    """
+    # Fast path for pages without any fenced code
+    if "```" not in content:
+        return content, []
 
-    Perhaps this would be simpler as a good system prompt...
+    code_blocks: List[str] = []
 
-    - In 'protect' mode: replaces code blocks with placeholders and returns (content_with_placeholders, code_blocks).
-    - In 'restore' mode: replaces placeholders in content with code_blocks and returns the restored content.
+    def replace_code_block(match):
+        # The index of the next code block is the current number of blocks
+        placeholder = f"CODEBLOCK_{len(code_blocks)}_PLACEHOLDER"
+        code_blocks.append(match.group(0))
+        return placeholder
 
-    Args:
-        content: The markdown content.
-        code_blocks: The list of code blocks (required for 'restore' mode).
-        mode: 'protect' or 'restore'.
+    content_with_placeholders = _CODE_BLOCK_RE.sub(replace_code_block, content)
+    return content_with_placeholders, code_blocks
 
-    Returns:
-        In 'protect' mode: (content_with_placeholders, code_blocks)
-        In 'restore' mode: restored_content
+
+def restore_code_blocks(content: str, code_blocks: List[str]) -> str:
     """
-    pattern = r"```[a-z]*\n[\s\S]*?\n```"
+    Replace code block placeholders in content with the original code blocks.
+    All placeholders are replaced in a single pass over the content, placeholders
+    without a matching code block are left untouched.
+    """
+    if not code_blocks:
+        return content
 
-    if mode == "protect":
-        code_blocks = []
+    def replace_placeholder(match):
+        index = int(match.group(1))
+        if index < len(code_blocks):
+            return code_blocks[index]
+        return match.group(0)
 
-        def replace_code_block(match):
-            code_blocks.append(match.group(0))
-            return f"CODEBLOCK_{len(code_blocks) - 1}_PLACEHOLDER"
+    return _PLACEHOLDER_RE.sub(replace_placeholder, content)
 
-        content_with_placeholders = re.sub(pattern, replace_code_block, content)
-        return content_with_placeholders, code_blocks
 
-    elif mode == "restore":
-        if code_blocks is None:
-            raise ValueError("code_blocks must be provided in restore mode")
-        for i, block in enumerate(code_blocks):
-            content = content.replace(f"CODEBLOCK_{i}_PLACEHOLDER", block)
-        return content
+def has_translatable_text(content: str) -> bool:
+    """
+    Whether the content has any text besides frontmatter and code blocks.
+    Pages without such text can be used as their own translation.
+    """
+    frontmatter_match = _FRONTMATTER_RE.match(content)
+    if frontmatter_match:
+        content = content[frontmatter_match.end(1) :]
 
-    else:
-        raise ValueError("mode must be 'protect' or 'restore'")
+    if "```" in content:
+        content = _CODE_BLOCK_RE.sub("", content)
 
+    return content != "" and not content.isspace()
 
-def protect_code_blocks(content: str) -> Tuple[str, List[str]]:
+
+def chunk_markdown(content: str, max_chars: int = 6000) -> List[str]:
     """
-    Replace code blocks in markdown with placeholders.
-    Returns the modified content and a list of code blocks.
+    Split markdown into chunks of at most max_chars characters.
+
+    The content is only split before level 1 and level 2 headings outside of
+    fenced code blocks, so a section longer than max_chars becomes a chunk on
+    its own. Joining the chunks gives the original content.
+    """
+    if len(content) <= max_chars:
+        return [content]
+
+    # Split into sections, each starting with a heading (except the first)
+    sections: List[str] = []
+    section_lines: List[str] = []
+    in_fence = False
+    for line in content.splitlines(keepends=True):
+        if line.startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and line.startswith(("# ", "## ")) and section_lines:
+            sections.append("".join(section_lines))
+            section_lines = []
+        section_lines.append(line)
+    sections.append("".join(section_lines))
+
+    # Merge consecutive sections as long as they fit into one chunk
+    chunks: List[str] = []
+    for section in sections:
+        if chunks and len(chunks[-1]) + len(section) <= max_chars:
+            chunks[-1] += section
+        else:
+            chunks.append(section)
+
+    return chunks
+
+
+def _scan_markdown_elements(content: str) -> Tuple[Dict[str, int], Optional[int]]:
     """
-    code_blocks = []
-    pattern = r"```[a-z]*\n[\s\S]*?\n```"
+    Count headers, code blocks and links in a single scan over the content.
 
-    def replace_code_block(match):
-        code_blocks.append(match.group(0))
-        return f"CODEBLOCK_{len(code_blocks) - 1}_PLACEHOLDER"
+    Returns the element counts and the end position of the first level 1
+    heading line (None if there is none), as found by _HEADING_RE.
+    """
+    headers = fences = links = 0
+    heading_end = None
+
+    for match in _INTEGRITY_RE.finditer(content):
+        element = match.lastgroup
+        if element == "links":
+            links += 1
+        elif element == "code_blocks":
+            fences += 1
+        else:
+            headers += 1
+            if heading_end is None and match.group() == "# ":
+                # A level 1 heading needs some text and a line break
+                line_end = content.find("\n", match.end())
+                if line_end > match.end():
+                    heading_end = line_end + 1
+
+    counts = {
+        "headers": headers,
+        # Each code block has an opening and a closing fence, hence counted twice
+        "code_blocks": fences // 2,
+        "links": links,
+    }
+    return counts, heading_end
 
-    content_with_placeholders = re.sub(pattern, replace_code_block, content)
-    return content_with_placeholders, code_blocks
 
+def _source_markdown_elements(source: str) -> Dict[str, int]:
+    """
+    Count the markdown elements of a source content, reusing earlier counts
+    for identical contents.
+    """
+    key = hashlib.blake2b(source.encode(), digest_size=16).digest()
+    counts = _source_elements_cache.get(key)
+
+    if counts is None:
+        counts, _ = _scan_markdown_elements(source)
+        if len(_source_elements_cache) >= _SOURCE_ELEMENTS_CACHE_SIZE:
+            # Drop the oldest entry
+            del _source_elements_cache[next(iter(_source_elements_cache))]
+        _source_elements_cache[key] = counts
 
-def restore_code_blocks(content: str, code_blocks: List[str]) -> str:
+    return counts
+
+
+def _markup_unchanged(source: str, translated: str) -> bool:
     """
-    Replace code block placeholders in content with the original code blocks.
+    Cheap prefilter for the markdown integrity check.
+
+    Compares the number of code fences, header lines and link separators with
+    plain substring counts, which are much faster than the regex scan. Only if
+    any of these differ, the full element counts need to be compared.
     """
-    for i, block in enumerate(code_blocks):
-        content = content.replace(f"CODEBLOCK_{i}_PLACEHOLDER", block)
-    return content
+    return (
+        source.count("```") == translated.count("```")
+        and source.count("](") == translated.count("](")
+        and source.count("\n#") + source.startswith("#")
+        == translated.count("\n#") + translated.startswith("#")
+    )
 
 
 def check_markdown_integrity(
@@ -122,30 +286,59 @@ def check_markdown_integrity(
         translated: The translated markdown content.
         logger: A logger instance to log warnings.
     """
-    # Mapping: key -> (pattern, flags, divisor)
-    # The divisor is used to adjust counts for specific elements like code blocks
-    # that have an opening and closing fence, hence counted twice.
-    element_definitions = {
-        "headers": (r"^#+\s", re.MULTILINE, 1),
-        "code_blocks": (
-            r"```",
-            0,
-            2,
-        ),  # count divided by 2, since each block gives two matches
-        "links": (r"\[.+?\]\(.+?\)", 0, 1),
-    }
+    if _markup_unchanged(source, translated):
+        return
 
-    expected_elements = {}
-    actual_elements = {}
+    expected_elements, _ = _scan_markdown_elements(source)
+    actual_elements, _ = _scan_markdown_elements(translated)
+    _warn_on_integrity_mismatch(expected_elements, actual_elements, logger)
 
-    for key, (pattern, flags, divisor) in element_definitions.items():
-        exp_count = len(re.findall(pattern, source, flags))
-        act_count = len(re.findall(pattern, translated, flags))
-        # Adjust count if needed
-        expected_elements[key] = exp_count // divisor
-        actual_elements[key] = act_count // divisor
 
+def _warn_on_integrity_mismatch(
+    expected_elements: Dict[str, int],
+    actual_elements: Dict[str, int],
+    logger: logging.Logger,
+) -> None:
     if expected_elements != actual_elements:
         logger.warning(
             f"Possible markdown corruption detected. Expected: {expected_elements}, Got: {actual_elements}"
         )
+
+
+def finalize_translation(
+    source: str,
+    translated: str,
+    source_lang: str,
+    target_lang: str,
+    theme_name: str,
+    logger: logging.Logger,
+) -> str:
+    """
+    Check the markdown integrity of a translation and add the translation notice.
+
+    Same as calling check_markdown_integrity() and add_translation_notice(), but
+    the translated content is scanned only once for both.
+
+    Args:
+        source: The original markdown content.
+        translated: The translated markdown content.
+        source_lang: The source language code.
+        target_lang: The target language code.
+        theme_name: The MkDocs theme name, selects the notice format.
+        logger: A logger instance to log warnings.
+
+    Returns:
+        The translated content including the translation notice.
+    """
+    if _markup_unchanged(source, translated):
+        heading_match = _HEADING_RE.search(translated)
+        heading_end = heading_match.end(1) if heading_match else None
+    else:
+        expected_elements = _source_markdown_elements(source)
+        actual_elements, heading_end = _scan_markdown_elements(translated)
+        _warn_on_integrity_mismatch(expected_elements, actual_elements, logger)
+
+    translation_notice = _translation_notice(
+        theme_name, source_lang.upper(), target_lang.upper()
+    )
+    return _insert_translation_notice(translated, translation_notice, heading_end)
@@ -6,23 +6,42 @@ import logging
 
 
 # Create the logger for the entire plugin, no matter in which
-# module its used
+# module its used. Handlers are attached by configure_logger(), so
+# merely importing the plugin does not open a log file.
 logger = logging.getLogger("mkdocs_translate_plugin")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(logging.INFO)
 
-# Create a file handler to log to a file
-file_handler = logging.FileHandler("mkdocs_translate_plugin.log")
-file_handler.setLevel(logging.INFO)
 
-# Create a console handler to log to the console
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
+def configure_logger(debug: bool = False) -> logging.Logger:
+    """
+    Attach the file and console handlers to the plugin logger.
 
-# Define a log format
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
+    The logger level is only lowered to DEBUG if requested, so debug records
+    are discarded before any formatting happens. Calling this function again
+    only updates the level.
+    """
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
-# Add the handlers to the logger
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+    if logger.handlers:
+        return logger
+
+    # Create a file handler to log to a file
+    file_handler = logging.FileHandler("mkdocs_translate_plugin.log")
+    file_handler.setLevel(logging.INFO)
+
+    # Create a console handler to log to the console
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.DEBUG)
+
+    # Define a log format
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
+
+    # Add the handlers to the logger
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+
+    return logger
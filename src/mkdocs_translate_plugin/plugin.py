@@ -7,15 +7,29 @@ MkDocs Translate Plugin
 """
 
 from pathlib import Path
-from typing import Literal
+from typing import Dict, List, Literal, Tuple
 
 import mkdocs
 from mkdocs.plugins import BasePlugin
 from mkdocs.config.defaults import MkDocsConfig
-
-from .log import logger
-from .helpers import add_translation_notice
-from .translation_services import translate_content
+from mkdocs.exceptions import PluginError
+
+from .log import configure_logger, logger
+from .helpers import (
+    finalize_translation,
+    iter_source_files,
+    read_markdown,
+    write_markdown,
+)
+from .translation_services import (
+    TranslationJob,
+    supports_batch_translation,
+    translate_many,
+)
+from .translation_services.cache import CACHE_DIRNAME, TranslationCache
+
+# Number of files sent per request to services supporting batch translation
+TRANSLATION_BATCH_SIZE = 20
 
 
 class TranslatePluginConfig(mkdocs.config.base.Config):
@@ -25,6 +39,12 @@ class TranslatePluginConfig(mkdocs.config.base.Config):
     # Making translation_service_api_key optional allow running in CI/CD
     # environments without an API key.
     translation_service_api_key = mkdocs.config.config_options.Type(str, default="")
+    # Maximum number of requests sent to the translation service concurrently
+    max_concurrency = mkdocs.config.config_options.Type(int, default=8)
+    # Limit the requests sent to the translation service per minute, 0 means no limit
+    requests_per_minute = mkdocs.config.config_options.Type(int, default=0)
+    # Log debug messages of this plugin
+    debug = mkdocs.config.config_options.Type(bool, default=False)
 
 
 class TranslatePlugin(BasePlugin[TranslatePluginConfig]):
@@ -38,8 +58,15 @@ class TranslatePlugin(BasePlugin[TranslatePluginConfig]):
 
     def on_config(self, config: MkDocsConfig, **kwargs) -> MkDocsConfig:
         """Store configuration settings for later use"""
+        for option in ("max_concurrency", "requests_per_minute"):
+            if self.config[option] < 0:
+                raise PluginError(
+                    f"translate: '{option}' must not be negative, got {self.config[option]}"
+                )
+
+        configure_logger(debug=self.config.debug)
         self.theme_name = config.theme.name or "mkdocs"  # "mkdocs" is the default theme
-        logger.debug(f"Configured with theme: {self.theme_name}")
+        logger.debug("Configured with theme: %s", self.theme_name)
         return config
 
     def on_pre_build(self, config: MkDocsConfig, **kwargs) -> None:
@@ -69,73 +96,141 @@ class TranslatePlugin(BasePlugin[TranslatePluginConfig]):
 
         if current_language != i18n_plugin.default_language:
             logger.debug(
-                f"Skipping on_pre_build hook for language '{current_language}': is not source language '{i18n_plugin.default_language}'"
+                "Skipping on_pre_build hook for language '%s': is not source language '%s'",
+                current_language,
+                i18n_plugin.default_language,
             )
             return
 
+        source_lang = i18n_plugin.default_language
+
+        # Target languages along with their file suffix, e.g. ("de", ".de.md")
         target_translations = [
-            lang
+            (lang, f".{lang}.md")
             for lang in i18n_plugin.all_languages
-            if lang != i18n_plugin.default_language
+            if lang != source_lang
         ]
 
         # Get source language file suffix
-        source_language_suffix = f".{i18n_plugin.default_language}.md"
+        source_language_suffix = f".{source_lang}.md"
 
         docs_dir = Path(config["docs_dir"])
-        for filepath in docs_dir.rglob("*.md"):
+        # Already translated contents, so unchanged source files are not sent
+        # to the translation service again
+        cache = TranslationCache(docs_dir.parent / CACHE_DIRNAME)
+
+        # Translations to request from the translation service, as tuples of
+        # (source content, target language, target filepath)
+        pending_translations = []
+
+        # Only source language files are of interest, translated files and
+        # assets are filtered while walking the docs directory
+        for filepath in iter_source_files(docs_dir, source_language_suffix):
             rel_filepath = filepath.relative_to(docs_dir.parent)
+            source_content = None
 
-            if rel_filepath.name.endswith(source_language_suffix):
-                logger.info(
-                    f"Source language file: {rel_filepath.name}, checking for translations..."
-                )
+            # Filename without the source language suffix, e.g. "index" for
+            # "index.en.md". Slicing only strips the actual suffix, even if the
+            # suffix text also appears somewhere else in the filename.
+            base_filename = filepath.name[: -len(source_language_suffix)]
+            parent_dir = filepath.parent
 
-                # Test if a translation file for each target language exists and
-                # if not, create it
-                for lang in target_translations:
-                    target_suffix = f".{lang}.md"
-                    target_filename = filepath.name.replace(
-                        source_language_suffix, target_suffix
+            logger.info(
+                "Source language file: %s, checking for translations...",
+                rel_filepath.name,
+            )
+
+            # Test if a translation file for each target language exists and
+            # if not, create it
+            for lang, target_suffix in target_translations:
+                target_filename = base_filename + target_suffix
+                target_filepath = parent_dir / target_filename
+
+                if target_filepath.exists():
+                    logger.info(
+                        "Translation file already exists: %s. Skipping...",
+                        target_filepath.name,
                     )
-                    target_filepath = filepath.parent / target_filename
-                    target_filepath = target_filepath.relative_to(docs_dir.parent)
-
-                    if target_filepath.exists():
-                        logger.info(
-                            f"Translation file already exists: {target_filepath.name}. Skipping..."
-                        )
-                    else:
-                        logger.info(
-                            f"🔥 Translating {rel_filepath} to {target_filepath}..."
-                        )
-                        source_content = filepath.read_text(encoding="utf-8")
-                        source_lang = i18n_plugin.default_language
-                        target_lang = lang
-
-                        translated_content = translate_content(
-                            config=self.config,
-                            content=source_content,
-                            source_lang=source_lang,
-                            target_lang=target_lang,
-                            logger=logger,
-                        )
-
-                        if translated_content:
-                            # Add translation notice to the content
-                            translated_content_with_notice = add_translation_notice(
-                                content=translated_content,
-                                source_lang=source_lang,
-                                target_lang=target_lang,
-                                theme_name=self.theme_name,
-                            )
-
-                            # Write the modified content to the file
-                            new_path = filepath.parent / target_filename
-                            new_path.write_text(
-                                translated_content_with_notice, encoding="utf-8"
-                            )
-                        else:
-                            logger.warning(
-                                f"Translation failed for {rel_filepath.name} to {target_filename}"
-                            )
+                else:
+                    logger.info(
+                        "🔥 Translating %s to %s...",
+                        rel_filepath,
+                        rel_filepath.with_name(target_filename),
+                    )
+                    # Read each source file once, no matter how many
+                    # target languages are missing
+                    if source_content is None:
+                        source_content = read_markdown(filepath)
+
+                    pending_translations.append((source_content, lang, target_filepath))
+
+        if not pending_translations:
+            return
+
+        # Services which accept several texts per request get batches of
+        # files with the same target language, all others one file per request.
+        batch_size = (
+            TRANSLATION_BATCH_SIZE
+            if supports_batch_translation(self.config, logger)
+            else 1
+        )
+        pending_by_lang: Dict[str, List[Tuple[str, str, Path]]] = {}
+        for pending in pending_translations:
+            pending_by_lang.setdefault(pending[1], []).append(pending)
+
+        batches = [
+            (lang, pendings[start : start + batch_size])
+            for lang, pendings in pending_by_lang.items()
+            for start in range(0, len(pendings), batch_size)
+        ]
+
+        jobs = [
+            TranslationJob(
+                contents=[pending[0] for pending in batch],
+                source_lang=source_lang,
+                target_lang=lang,
+            )
+            for lang, batch in batches
+        ]
+
+        for index, translated_contents in translate_many(
+            self.config, jobs, logger, cache=cache
+        ):
+            _, batch = batches[index]
+            for pending, translated_content in zip(batch, translated_contents):
+                source_content, lang, new_path = pending
+
+                self._write_translation(
+                    source_content=source_content,
+                    translated_content=translated_content,
+                    source_lang=source_lang,
+                    target_lang=lang,
+                    target_filepath=new_path,
+                )
+
+    def _write_translation(
+        self,
+        source_content: str,
+        translated_content: str,
+        source_lang: str,
+        target_lang: str,
+        target_filepath: Path,
+    ) -> None:
+        """Write translated content including a translation notice to its target file"""
+        if translated_content:
+            # Check markdown integrity and add translation notice to the content
+            translated_content_with_notice = finalize_translation(
+                source=source_content,
+                translated=translated_content,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                theme_name=self.theme_name,
+                logger=logger,
+            )
+
+            # Write the modified content to the file
+            write_markdown(target_filepath, translated_content_with_notice)
+        else:
+            logger.warning(
+                "Translation failed for %s (%s)", target_filepath.name, target_lang
+            )
@@ -4,22 +4,33 @@
 
 import importlib
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import ModuleType
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
+from ..helpers import has_translatable_text
+from .cache import TranslationCache
+from .limits import DEFAULT_MAX_CONCURRENCY
 
-def translate_content(
-    config, content: str, source_lang: str, target_lang: str, logger: logging.Logger
-) -> str:
+
+__all__ = [
+    "TranslationCache",
+    "TranslationJob",
+    "supports_batch_translation",
+    "translate_batch",
+    "translate_content",
+    "translate_many",
+]
+
+
+def _import_service_module(config, logger: logging.Logger) -> ModuleType:
     """
-    Translate content using the configured service.
-    Dynamically imports the corresponding module and calls the translation function.
+    Import the module of the configured translation service.
     """
     module_name = f"mkdocs_translate_plugin.translation_services.{config.translation_service.lower()}"
-    function_name = f"translate_with_{config.translation_service.lower()}"
 
     try:
-        module = importlib.import_module(module_name)
-        translation_func = getattr(module, function_name)
-        return translation_func(config, content, source_lang, target_lang, logger)
+        return importlib.import_module(module_name)
 
     except ModuleNotFoundError:
         logger.error(f"Translation service module '{module_name}' not found.")
@@ -27,10 +38,201 @@ def translate_content(
             f"Unsupported translation service: {config.translation_service}"
         )
 
+
+def translate_content(
+    config,
+    content: str,
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+    cache: Optional[TranslationCache] = None,
+) -> str:
+    """
+    Translate content using the configured service.
+    Dynamically imports the corresponding module and calls the translation function.
+    If a cache is given, cached translations are used and new ones are stored.
+    Content without translatable text is returned as is, see translate_batch().
+    """
+    if not has_translatable_text(content):
+        return content
+
+    if cache is not None:
+        return translate_batch(
+            config, [content], source_lang, target_lang, logger, cache=cache
+        )[0]
+
+    module = _import_service_module(config, logger)
+    function_name = f"translate_with_{config.translation_service.lower()}"
+
+    try:
+        translation_func = getattr(module, function_name)
+
     except AttributeError:
         logger.error(
-            f"Translation function '{function_name}' not found in module '{module_name}'."
+            f"Translation function '{function_name}' not found in module '{module.__name__}'."
         )
         raise ValueError(
             f"Unsupported translation service: {config.translation_service}"
         )
+
+    return translation_func(config, content, source_lang, target_lang, logger)
+
+
+def supports_batch_translation(config, logger: logging.Logger) -> bool:
+    """
+    Whether the configured service translates several contents per request.
+    """
+    module = _import_service_module(config, logger)
+    return hasattr(module, f"translate_batch_with_{config.translation_service.lower()}")
+
+
+def translate_batch(
+    config,
+    contents: List[str],
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+    cache: Optional[TranslationCache] = None,
+) -> List[str]:
+    """
+    Translate several contents to the same target language.
+
+    Calls the batch translation function of the configured service, if it
+    provides one, so all contents are sent in as few requests as possible.
+    Otherwise the contents are translated one by one. The translations are
+    returned in the order of the given contents.
+
+    If a cache is given, only contents without a cached translation are sent
+    to the service, and their successful translations are stored.
+    """
+    if cache is None:
+        return _translate_batch(config, contents, source_lang, target_lang, logger)
+
+    module = _import_service_module(config, logger)
+    # Services using an LLM name it in their `LLM` constant
+    model = getattr(module, "LLM", "")
+    keys = [
+        cache.key(content, source_lang, target_lang, config.translation_service, model)
+        for content in contents
+    ]
+
+    translations = [cache.get(key) for key in keys]
+    missing = [
+        index for index, translated in enumerate(translations) if translated is None
+    ]
+
+    if len(missing) < len(contents):
+        logger.info(
+            "Using %d cached translation(s) to '%s'",
+            len(contents) - len(missing),
+            target_lang,
+        )
+
+    if missing:
+        translated_contents = _translate_batch(
+            config,
+            [contents[index] for index in missing],
+            source_lang,
+            target_lang,
+            logger,
+        )
+        for index, translated_content in zip(missing, translated_contents):
+            translations[index] = translated_content
+            if translated_content:
+                cache.set(keys[index], translated_content)
+
+    return [translated or "" for translated in translations]
+
+
+def _translate_batch(
+    config,
+    contents: List[str],
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+) -> List[str]:
+    # Pages consisting of frontmatter and code blocks only are not sent to
+    # the service, they are their own translation
+    translations = list(contents)
+    pending = [
+        index
+        for index, content in enumerate(contents)
+        if has_translatable_text(content)
+    ]
+
+    if len(pending) < len(contents):
+        logger.debug(
+            "Skipping %d content(s) without translatable text",
+            len(contents) - len(pending),
+        )
+
+    if not pending:
+        return translations
+
+    module = _import_service_module(config, logger)
+    function_name = f"translate_batch_with_{config.translation_service.lower()}"
+    batch_translation_func = getattr(module, function_name, None)
+    pending_contents = [contents[index] for index in pending]
+
+    if batch_translation_func is None:
+        translated_contents = [
+            translate_content(config, content, source_lang, target_lang, logger)
+            for content in pending_contents
+        ]
+    else:
+        translated_contents = batch_translation_func(
+            config, pending_contents, source_lang, target_lang, logger
+        )
+
+    for index, translated_content in zip(pending, translated_contents):
+        translations[index] = translated_content
+
+    return translations
+
+
+class TranslationJob(NamedTuple):
+    """Contents to translate from one language to another, see translate_batch()"""
+
+    contents: List[str]
+    source_lang: str
+    target_lang: str
+
+
+def translate_many(
+    config,
+    jobs: List[TranslationJob],
+    logger: logging.Logger,
+    cache: Optional[TranslationCache] = None,
+) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Process translation jobs concurrently.
+
+    Up to `config.max_concurrency` jobs are sent to the translation service at
+    once. Yields (job index, translations) tuples as soon as each job is done.
+    A job raising an exception yields an empty string for each of its contents.
+    The optional cache is used as in translate_batch(). The requests sent by
+    the services are limited as a whole, see limits.service_request().
+    """
+    max_workers = config.max_concurrency or DEFAULT_MAX_CONCURRENCY
+
+    def run_job(job: TranslationJob) -> List[str]:
+        return translate_batch(
+            config, job.contents, job.source_lang, job.target_lang, logger, cache=cache
+        )
+
+    # Translation requests are network-bound: keep several of them in flight
+    # and hand out each result as soon as it arrives.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_job, job): index for index, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                translations = future.result()
+            except Exception as e:
+                # Report the job as failed, like services do for single
+                # contents, instead of aborting all other jobs
+                logger.error(f"Translation job {index} failed: {str(e)}")
+                translations = [""] * len(jobs[index].contents)
+            yield index, translations
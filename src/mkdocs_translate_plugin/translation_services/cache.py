@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from ..helpers import read_markdown, write_markdown
+
+
+# Default cache directory name, relative to the project root
+CACHE_DIRNAME = ".mkdocs_translate_cache"
+
+
+class TranslationCache:
+    """
+    On-disk, content-addressed cache of translated markdown contents.
+
+    Each translation is stored in its own file, named by a digest of the source
+    content and everything else which affects the translation: languages,
+    translation service and model. Unchanged source files are therefore never
+    sent to the translation service again, while a changed source file or a
+    different model results in a new translation.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def key(
+        content: str, source_lang: str, target_lang: str, service: str, model: str
+    ) -> str:
+        """
+        Build the cache key of a translation.
+        """
+        params = "|".join((service, model, source_lang, target_lang, "")).encode()
+        return hashlib.blake2b(params + content.encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.md"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached translation, None if there is none.
+        """
+        try:
+            return read_markdown(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, translated_content: str) -> None:
+        """
+        Store a translation. The file is written under a temporary name first,
+        so an interrupted build never leaves a truncated translation behind.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(
+            f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        write_markdown(tmp_path, translated_content)
+        os.replace(tmp_path, path)
@@ -2,13 +2,73 @@
 #
 # SPDX-License-Identifier: MIT
 
+import json
 import logging
-from typing import cast
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, cast
 import deepl
-from markdown import markdown
-from markdownify import markdownify as md
 # import pypandoc
 
+from .limits import service_request
+
+
+# DeepL rejects request bodies larger than 128 KiB and more than 50 texts per
+# request. The margin leaves room for the other request parameters.
+MAX_REQUEST_BYTES = 120 * 1024
+MAX_TEXTS_PER_REQUEST = 50
+
+# DeepL translators by auth key, see _get_translator()
+_TRANSLATORS: Dict[str, deepl.Translator] = {}
+_TRANSLATORS_LOCK = threading.Lock()
+
+
+def _get_translator(config) -> deepl.Translator:
+    """
+    Return the DeepL translator for the configured auth key, created on first use.
+    Sharing it keeps the HTTP connections to the DeepL API alive between requests.
+    """
+    auth_key = config.translation_service_api_key
+
+    with _TRANSLATORS_LOCK:
+        translator = _TRANSLATORS.get(auth_key)
+        if translator is None:
+            translator = deepl.Translator(auth_key)
+            _TRANSLATORS[auth_key] = translator
+
+    return translator
+
+
+@lru_cache(maxsize=1024)
+def _md_to_html(content: str) -> str:
+    """
+    Convert markdown to HTML. Memoized, since every source content is
+    converted once per target language.
+    """
+    # Imported here, so only builds actually translating with DeepL pay for it
+    from markdown import markdown
+
+    return markdown(
+        content,
+        extensions=["meta", "tables", "fenced_code", "attr_list", "def_list"],
+        output_format="html",
+    )
+
+
+def _markdown_to_html(content: str, logger: logging.Logger) -> Optional[str]:
+    """
+    Convert markdown (including frontmatter) to HTML, None if conversion fails.
+    """
+    try:
+        html_content = _md_to_html(content)
+        logger.debug("DeepL HTML preview: %s", html_content[:200])
+
+    except RuntimeError as e:
+        logger.error("Conversion error: %s", e)
+        return None
+
+    return html_content
+
 
 def translate_with_deepl(
     config, content: str, source_lang: str, target_lang: str, logger: logging.Logger
@@ -17,29 +77,27 @@ def translate_with_deepl(
     Translate markdown content using DeepL API with HTML round-tripping
     to preserve formatting.
     """
-    logger.warning("DeepL translation service is largely untestet.")
-
-    # Convert markdown (including frontmatter) to HTML
-    try:
-        html_content = markdown(
-            content,
-            extensions=["meta", "tables", "fenced_code", "attr_list", "def_list"],
-            output_format="html",
-        )
-
-        print(f"{html_content=}")
+    return translate_batch_with_deepl(
+        config, [content], source_lang, target_lang, logger
+    )[0]
 
-    except RuntimeError as e:
-        print(f"Conversion error: {e}")
-        return ""
 
-    auth_key = config.translation_service_api_key
-    translator = deepl.Translator(auth_key)
+def _request_translations(
+    config,
+    html_contents: List[str],
+    source_lang: str,
+    target_lang: str,
+) -> List[str]:
+    """
+    Translate HTML contents with a single DeepL API request.
+    """
+    translator = _get_translator(config)
 
-    try:
-        # Translate HTML content using DeepL API
-        result = translator.translate_text(
-            html_content,
+    # Passing a list of texts returns a list of TextResult objects in the
+    # same order.
+    with service_request(config):
+        results = translator.translate_text(
+            html_contents,
             source_lang=source_lang.upper(),
             target_lang=target_lang.upper(),
             tag_handling="html",
@@ -48,21 +106,99 @@ def translate_with_deepl(
             # split_sentences="nonewlines",
         )
 
-        # deepl.Translator.translate_text() can return either a single
-        # TextResult or a list of TextResult objects, depending on the input.
-        # Tell mypy this is always a TextResult, not a list
-        result = cast(deepl.TextResult, result)
-        translated_html = result.text
-        print(f"{translated_html=}")
+    # deepl.Translator.translate_text() can return either a single
+    # TextResult or a list of TextResult objects, depending on the input.
+    # Tell mypy this is always a list, since we always pass a list
+    results = cast(List[deepl.TextResult], results)
+    return [result.text for result in results]
+
+
+def translate_batch_with_deepl(
+    config,
+    contents: List[str],
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+) -> List[str]:
+    """
+    Translate several markdown contents using as few DeepL API requests as
+    possible, with HTML round-tripping to preserve formatting.
+
+    The contents are sent in batches within the request limits of DeepL. If
+    a batch fails, its contents are translated one by one.
+
+    Returns the translations in the order of the given contents, an empty
+    string for each content that could not be translated.
+    """
+    logger.warning("DeepL translation service is largely untestet.")
+
+    translated_contents = [""] * len(contents)
+
+    # Contents which fail to convert are not sent to DeepL
+    html_contents = {}
+    for index, content in enumerate(contents):
+        html_content = _markdown_to_html(content, logger)
+        if html_content is not None:
+            html_contents[index] = html_content
+
+    if not html_contents:
+        return translated_contents
+
+    # Group content indices into batches limited by their size in the JSON
+    # request body, as sent by the DeepL client
+    batches: List[List[int]] = []
+    batch_bytes = 0
+    for index, html_content in html_contents.items():
+        content_bytes = len(json.dumps(html_content))
+        if (
+            not batches
+            or len(batches[-1]) >= MAX_TEXTS_PER_REQUEST
+            or batch_bytes + content_bytes > MAX_REQUEST_BYTES
+        ):
+            batches.append([])
+            batch_bytes = 0
+        batches[-1].append(index)
+        batch_bytes += content_bytes
+
+    # Imported here, so only builds actually translating with DeepL pay for it
+    from markdownify import markdownify as md
+
+    for batch in batches:
+        translated_htmls: Dict[int, str] = {}
+        try:
+            batch_htmls = _request_translations(
+                config,
+                [html_contents[index] for index in batch],
+                source_lang,
+                target_lang,
+            )
+            translated_htmls = dict(zip(batch, batch_htmls))
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error("Translation error: %s", e)
+            else:
+                logger.warning(
+                    "Batch translation failed: %s. Translating contents one by one...",
+                    e,
+                )
+                for index in batch:
+                    try:
+                        translated_htmls[index] = _request_translations(
+                            config, [html_contents[index]], source_lang, target_lang
+                        )[0]
+                    except Exception as error:
+                        logger.error("Translation error: %s", error)
 
-        # Convert translated HTML back to markdown
-        # translated_markdown = pypandoc.convert_text(
-        #     translated_html, "gfm", format="html", extra_args=["--wrap=none"]
-        # )
-        translated_markdown = md(translated_html)
+        for index, translated_html in translated_htmls.items():
+            logger.debug("DeepL translated HTML preview: %s", translated_html[:200])
 
-        return translated_markdown
+            # Convert translated HTML back to markdown
+            # translated_markdown = pypandoc.convert_text(
+            #     translated_html, "gfm", format="html", extra_args=["--wrap=none"]
+            # )
+            try:
+                translated_contents[index] = md(translated_html)
+            except Exception as e:
+                logger.error("Conversion error: %s", e)
 
-    except Exception as e:
-        print(f"Translation error: {e}")
-        return ""
+    return translated_contents
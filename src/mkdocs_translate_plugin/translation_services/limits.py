@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+# Default number of requests sent to the translation service concurrently
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class _RateLimiter:
+    """
+    Allow at most `requests_per_minute` calls of acquire() within any 60 seconds
+    sliding window, blocking the caller until the next call is allowed.
+    """
+
+    def __init__(self, requests_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self._timestamps: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= 60:
+                    self._timestamps.popleft()
+
+                if len(self._timestamps) < self.requests_per_minute:
+                    self._timestamps.append(now)
+                    return
+
+                time.sleep(60 - (now - self._timestamps[0]))
+
+
+# Rate limiters by requests per minute, shared by all services and threads
+_RATE_LIMITERS: Dict[int, _RateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def _get_rate_limiter(requests_per_minute: int) -> _RateLimiter:
+    with _RATE_LIMITERS_LOCK:
+        rate_limiter = _RATE_LIMITERS.get(requests_per_minute)
+        if rate_limiter is None:
+            rate_limiter = _RateLimiter(requests_per_minute)
+            _RATE_LIMITERS[requests_per_minute] = rate_limiter
+
+    return rate_limiter
+
+
+# Semaphores by maximum concurrency, shared by all services and threads
+_SEMAPHORES: Dict[int, threading.BoundedSemaphore] = {}
+_SEMAPHORES_LOCK = threading.Lock()
+
+
+def _get_semaphore(max_concurrency: int) -> threading.BoundedSemaphore:
+    with _SEMAPHORES_LOCK:
+        semaphore = _SEMAPHORES.get(max_concurrency)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max_concurrency)
+            _SEMAPHORES[max_concurrency] = semaphore
+
+    return semaphore
+
+
+@contextmanager
+def service_request(config) -> Iterator[None]:
+    """
+    Enclose every request sent to a translation service.
+
+    At most `config.max_concurrency` requests are in flight at once, no matter
+    how many threads the services use, e.g. for chunks of a long document.
+    Blocks until `config.requests_per_minute` allows another request, if set.
+    Cached translations and skipped pages never get here, so they do not count
+    against the limits.
+    """
+    with _get_semaphore(config.max_concurrency or DEFAULT_MAX_CONCURRENCY):
+        if config.requests_per_minute:
+            _get_rate_limiter(config.requests_per_minute).acquire()
+
+        yield
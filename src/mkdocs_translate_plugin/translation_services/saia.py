@@ -5,9 +5,13 @@
 import re
 import time
 import logging
-from openai import OpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from openai import OpenAI, Timeout
 
-from ..helpers import check_markdown_integrity, protect_code_blocks, restore_code_blocks
+from ..helpers import chunk_markdown, protect_code_blocks, restore_code_blocks
+from .limits import DEFAULT_MAX_CONCURRENCY, service_request
 
 
 # SAIA supported models
@@ -20,49 +24,86 @@ from ..helpers import check_markdown_integrity, protect_code_blocks, restore_cod
 # openai-gpt-oss-120b
 LLM = "openai-gpt-oss-120b"
 
+SAIA_BASE_URL = "https://chat-ai.academiccloud.de/v1"
 
-def translate_with_saia(
-    config, content: str, source_lang: str, target_lang: str, logger: logging.Logger
-) -> str:
-    """
-    Translate markdown content using an OpenAI-compatible API while preserving formatting.
+# An unreachable API fails after a few seconds. Once connected, up to 60 seconds
+# may pass between two received chunks of the streamed response.
+SAIA_TIMEOUT = Timeout(60.0, connect=5.0)
 
-    This function uses detailed prompting to instruct the LLM to preserve all markdown
-    elements including code blocks, links, headers, lists, and special formatting.
+# OpenAI clients by (api key, base url), see _get_client()
+_CLIENTS: Dict[Tuple[str, str], OpenAI] = {}
+_CLIENTS_LOCK = threading.Lock()
 
-    https://docs.hpc.gwdg.de/services/chat-ai/models/index.html
-    https://docs.hpc.gwdg.de/services/saia/index.html
+# Documents longer than this are not batched, but split at their headings into
+# chunks of at most this many characters. Keeps every request and its response
+# well below the token limits of the LLM.
+MAX_CHUNK_CHARS = 6000
+
+# Maximum number of characters of all documents joined into one batch request
+MAX_BATCH_CHARS = MAX_CHUNK_CHARS
+
+# Line separating the documents of a batch request, e.g. "%%---DOC 1---%%"
+DOC_SEPARATOR = "%%---DOC {index}---%%"
+_DOC_SEPARATOR_RE = re.compile(r"^%%---DOC (\d+)---%%[ \t]*$", re.MULTILINE)
+
+# Reasoning or explanation of the LLM, enclosed in `<think></think>` tags
+_THINK_RE = re.compile(r"<think>(.*?)</think>", re.DOTALL)
+
+# System prompt for precise instructions
+SYSTEM_PROMPT = (
+    "You are an expert translator specialized in technical documentation. "
+    "Your task is to translate markdown content while perfectly preserving ALL markdown formatting and structure. "
+    "\n\nRULES TO STRICTLY FOLLOW:"
+    "\n1. Keep all headers (# Heading) with the exact same level"
+    "\n2. Preserve all bullet points and numbered lists with their original indentation"
+    "\n3. Keep all hyperlinks in format [text](url) - translate only the text part, NOT the URL"
+    "\n4. Keep all images in format ![alt text](url) - translate only the alt text part"
+    "\n5. Keep all blockquotes (lines starting with >) with their original nesting level"
+    "\n6. Preserve all inline formatting: **bold**, *italic*, `code`, ~~strikethrough~~"
+    "\n7. Keep all tables with their original structure, including | and - characters"
+    "\n8. Preserve all horizontal rules (---)"
+    "\n9. Keep all line breaks, including trailing double spaces for forced line breaks"
+    "\n10. DO NOT add or remove any markdown elements or structure"
+    "\n11. DO NOT translate content inside placeholders marked as CODEBLOCK_X_PLACEHOLDER"
+    "\n12. ALWAYS maintain the exact same document structure"
+    "\n13. ALWAYS end the translated content with blank line"
+    "\n14. Keep all document separator lines like %%---DOC 1---%% exactly as they are, on their own line"
+    "\n\nThis is critically important documentation that must maintain its exact structure."
+)
+
+
+def _get_client(config) -> OpenAI:
     """
+    Return the OpenAI client for the configured API key, created on first use.
 
-    client = OpenAI(
-        api_key=config.translation_service_api_key,
-        base_url="https://chat-ai.academiccloud.de/v1",
-    )
+    The client is shared by all pages and threads, so its connection pool
+    keeps the TLS connections to the SAIA API alive between requests.
+    """
+    key = (config.translation_service_api_key, SAIA_BASE_URL)
 
-    # Protect code blocks before translation
-    content_with_placeholders, code_blocks = protect_code_blocks(content)
-
-    # System prompt for precise instructions
-    system_prompt = (
-        "You are an expert translator specialized in technical documentation. "
-        "Your task is to translate markdown content while perfectly preserving ALL markdown formatting and structure. "
-        "\n\nRULES TO STRICTLY FOLLOW:"
-        "\n1. Keep all headers (# Heading) with the exact same level"
-        "\n2. Preserve all bullet points and numbered lists with their original indentation"
-        "\n3. Keep all hyperlinks in format [text](url) - translate only the text part, NOT the URL"
-        "\n4. Keep all images in format ![alt text](url) - translate only the alt text part"
-        "\n5. Keep all blockquotes (lines starting with >) with their original nesting level"
-        "\n6. Preserve all inline formatting: **bold**, *italic*, `code`, ~~strikethrough~~"
-        "\n7. Keep all tables with their original structure, including | and - characters"
-        "\n8. Preserve all horizontal rules (---)"
-        "\n9. Keep all line breaks, including trailing double spaces for forced line breaks"
-        "\n10. DO NOT add or remove any markdown elements or structure"
-        "\n11. DO NOT translate content inside placeholders marked as CODEBLOCK_X_PLACEHOLDER"
-        "\n12. ALWAYS maintain the exact same document structure"
-        "\n13. ALWAYS end the translated content with blank line"
-        "\n\nThis is critically important documentation that must maintain its exact structure."
-    )
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=config.translation_service_api_key,
+                base_url=SAIA_BASE_URL,
+                timeout=SAIA_TIMEOUT,
+            )
+            _CLIENTS[key] = client
+
+    return client
 
+
+def _request_translation(
+    config,
+    content_with_placeholders: str,
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+) -> Optional[str]:
+    """
+    Send content to the LLM and return the translated text, None on failure.
+    """
     # User prompt with the content to translate
     user_prompt = (
         f"Translate the following markdown content from {source_lang.upper()} to {target_lang.upper()}. "
@@ -75,30 +116,51 @@ def translate_with_saia(
     try:
         logger.debug(f"Attempting translation with model: {LLM}")
 
-        start_time = time.time()  # Start timing
-
-        chat_completion = client.chat.completions.create(
-            model=LLM,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0,  # Use 0 for more deterministic output
-            top_p=0.3,
-            presence_penalty=0.0,
-            # max_tokens=8192,  # Adjust based on content length
-            extra_body={
-                "chat_template_kwargs": {"enable_thinking": False},
-            },
-        )
+        client = _get_client(config)
+
+        with service_request(config):
+            start_time = time.time()  # Start timing
+
+            # Stream the response, so the translation is received while it is
+            # generated instead of waiting for the complete response
+            stream = client.chat.completions.create(
+                model=LLM,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=0,  # Use 0 for more deterministic output
+                top_p=0.3,
+                presence_penalty=0.0,
+                # max_tokens=8192,  # Adjust based on content length
+                extra_body={
+                    "chat_template_kwargs": {"enable_thinking": False},
+                },
+                stream=True,
+            )
+
+            parts = []
+            first_token_duration = None
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                if first_token_duration is None:
+                    first_token_duration = time.time() - start_time
+                    logger.debug(
+                        f"First token after: {first_token_duration:.2f} seconds"
+                    )
+                parts.append(chunk.choices[0].delta.content or "")
 
         duration = time.time() - start_time  # End timing
         logger.debug(f"API response time: {duration:.2f} seconds")
 
-        translated_text = chat_completion.choices[0].message.content
+        translated_text = "".join(parts)
         logger.debug(f"Successfully translated with model: {LLM}")
 
-        logger.info(f"✅ LLM: {LLM}; Duration: {duration:.2f} seconds;")
+        logger.info(
+            f"✅ LLM: {LLM}; First token: {first_token_duration or duration:.2f} seconds; "
+            f"Duration: {duration:.2f} seconds;"
+        )
 
     except Exception as e:
         error_msg = f"Error with model {LLM}: {str(e)}"
@@ -107,18 +169,210 @@ def translate_with_saia(
 
     if translated_text is None:
         logger.error(f"Translation attempt failed: {'; '.join(errors)}")
-        return ""
+        return None
 
     # If there is a reasoning or explanation, drop it. This ouput is enclosed in `<think></think>` tags.
-    reasoning_match = re.search(r"<think>(.*?)</think>", translated_text, re.DOTALL)
+    reasoning_match = "<think>" in translated_text and _THINK_RE.search(translated_text)
     if reasoning_match:
         translated_text = translated_text.replace(reasoning_match.group(0), "")
         logger.info(f"Extracted reasoning: {reasoning_match.group(1)}")
 
-    # Restore code blocks in the translated content
-    translated_text = restore_code_blocks(translated_text, code_blocks)
+    return translated_text
+
+
+def translate_with_saia(
+    config, content: str, source_lang: str, target_lang: str, logger: logging.Logger
+) -> str:
+    """
+    Translate markdown content using an OpenAI-compatible API while preserving formatting.
+
+    This function uses detailed prompting to instruct the LLM to preserve all markdown
+    elements including code blocks, links, headers, lists, and special formatting.
+
+    https://docs.hpc.gwdg.de/services/chat-ai/models/index.html
+    https://docs.hpc.gwdg.de/services/saia/index.html
+    """
+    return translate_batch_with_saia(
+        config, [content], source_lang, target_lang, logger
+    )[0]
+
+
+def _translate_chunked(
+    config,
+    content_with_placeholders: str,
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+) -> Optional[str]:
+    """
+    Translate a long document in chunks of at most MAX_CHUNK_CHARS characters,
+    several chunks at once. Returns None if any chunk fails.
+
+    The document is chunked after its code blocks are protected, so the
+    placeholder numbers stay unique across the whole document.
+    """
+    chunks = chunk_markdown(content_with_placeholders, MAX_CHUNK_CHARS)
+    if len(chunks) == 1:
+        return _request_translation(
+            config, content_with_placeholders, source_lang, target_lang, logger
+        )
+
+    logger.debug(f"Translating document in {len(chunks)} chunks")
+
+    # The number of requests in flight is capped by service_request()
+    max_workers = config.max_concurrency or DEFAULT_MAX_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        translated_chunks = list(
+            executor.map(
+                lambda chunk: _request_translation(
+                    config, chunk, source_lang, target_lang, logger
+                ),
+                chunks,
+            )
+        )
+
+    stripped_chunks = []
+    for translated_chunk in translated_chunks:
+        if translated_chunk is None:
+            return None
+        stripped_chunks.append(translated_chunk.strip())
+
+    # Each chunk starts with a heading, which needs a blank line before it
+    return "\n\n".join(stripped_chunks)
+
+
+def _split_batch_response(
+    translated_text: str, count: int
+) -> Optional[List[Optional[str]]]:
+    """
+    Split the translation of a batch request at its document separators.
+    Returns None if the separators do not match the number of documents.
+    """
+    parts = _DOC_SEPARATOR_RE.split(translated_text)
+
+    # re.split() with a capturing group yields
+    # [text before first separator, index, document, index, document, ...]
+    indices = [int(index) for index in parts[1::2]]
+    if indices != list(range(1, count + 1)) or parts[0].strip():
+        return None
+
+    documents: List[Optional[str]] = list(parts[2::2])
+    return documents
+
+
+def _translate_documents(
+    config,
+    contents_with_placeholders: List[str],
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+) -> List[Optional[str]]:
+    """
+    Translate the documents of one batch, in a single request if there are
+    several. Returns None for each document that could not be translated.
+    """
+    if len(contents_with_placeholders) == 1:
+        return [
+            _translate_chunked(
+                config, contents_with_placeholders[0], source_lang, target_lang, logger
+            )
+        ]
+
+    joined_content = "\n\n".join(
+        f"{DOC_SEPARATOR.format(index=position)}\n\n{content_with_placeholders}"
+        for position, content_with_placeholders in enumerate(
+            contents_with_placeholders, start=1
+        )
+    )
+    translated_text = _request_translation(
+        config, joined_content, source_lang, target_lang, logger
+    )
+    if translated_text is None:
+        return [None] * len(contents_with_placeholders)
+
+    translated_parts = _split_batch_response(
+        translated_text, len(contents_with_placeholders)
+    )
+    if translated_parts is not None:
+        return translated_parts
+
+    logger.warning(
+        "Document separators not preserved in batch translation. "
+        "Translating documents one by one..."
+    )
+    return [
+        _translate_chunked(
+            config, content_with_placeholders, source_lang, target_lang, logger
+        )
+        for content_with_placeholders in contents_with_placeholders
+    ]
+
+
+def translate_batch_with_saia(
+    config,
+    contents: List[str],
+    source_lang: str,
+    target_lang: str,
+    logger: logging.Logger,
+) -> List[str]:
+    """
+    Translate several markdown contents with as few LLM requests as possible.
+
+    The contents are joined with separator lines into batches of at most
+    MAX_BATCH_CHARS characters, each batch is sent as one request and the
+    response is split at the separators again. If the LLM does not keep the
+    separators intact, the documents of that batch are translated one by one.
+    Documents longer than MAX_CHUNK_CHARS are translated on their own, in
+    chunks. The batches are translated concurrently.
+
+    Returns the translations in the order of the given contents.
+    """
+    # Protect code blocks before translation, per document
+    protected = [protect_code_blocks(content) for content in contents]
+
+    # Group document indices into batches limited by their joined length.
+    # Long documents get a batch of their own, to be translated in chunks.
+    batches: List[List[int]] = []
+    batch_chars = 0
+    batch_is_open = False
+    for index, (content_with_placeholders, _) in enumerate(protected):
+        is_long = len(content_with_placeholders) > MAX_CHUNK_CHARS
+        if (
+            not batch_is_open
+            or is_long
+            or batch_chars + len(content_with_placeholders) > MAX_BATCH_CHARS
+        ):
+            batches.append([])
+            batch_chars = 0
+        batches[-1].append(index)
+        batch_chars += len(content_with_placeholders)
+        batch_is_open = not is_long
+
+    # The number of requests in flight is capped by service_request()
+    max_workers = config.max_concurrency or DEFAULT_MAX_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        batch_translations = executor.map(
+            lambda batch: _translate_documents(
+                config,
+                [protected[index][0] for index in batch],
+                source_lang,
+                target_lang,
+                logger,
+            ),
+            batches,
+        )
+
+        translated_contents = [""] * len(contents)
+        for batch, translated_parts in zip(batches, batch_translations):
+            for index, translated_text in zip(batch, translated_parts):
+                if translated_text is None:
+                    continue
 
-    # Check markdown integrity
-    check_markdown_integrity(content, translated_text, logger)
+                # Restore code blocks in the translated content. The markdown
+                # integrity is checked by the plugin, along with adding the
+                # translation notice.
+                code_blocks = protected[index][1]
+                translated_text = restore_code_blocks(translated_text, code_blocks)
+                translated_contents[index] = translated_text.strip()
 
-    return translated_text.strip()
+    return translated_contents
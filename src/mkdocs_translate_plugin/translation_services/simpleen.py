@@ -3,8 +3,32 @@
 # SPDX-License-Identifier: MIT
 
 import json
+import orjson
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .limits import service_request
+
+
+# Shared session, so the TCP and TLS connections to the Simpleen API are
+# reused for all pages instead of being set up again for each request.
+# Translation requests are idempotent, hence POST requests are retried as well.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(["POST"]),
+        ),
+    ),
+)
 
 
 def translate_with_simpleen(
@@ -15,7 +39,8 @@ def translate_with_simpleen(
 
     translated_text = None
 
-    url = f"https://api.simpleen.io/translate?auth_key={config.translation_service_api_key}"
+    url = "https://api.simpleen.io/translate"
+    params = {"auth_key": config.translation_service_api_key}
     headers = {"Accept": "application/json", "Content-Type": "application/json"}
 
     payload = {
@@ -26,7 +51,11 @@ def translate_with_simpleen(
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        # orjson serializes the markdown text much faster than the stdlib json
+        with service_request(config):
+            response = _SESSION.post(
+                url, params=params, headers=headers, data=orjson.dumps(payload)
+            )
         response.raise_for_status()  # Raise an exception for HTTP errors
         translated_text = response.text
     except requests.exceptions.RequestException as e:
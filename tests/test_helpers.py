@@ -3,8 +3,21 @@
 # SPDX-License-Identifier: MIT
 
 
+import logging
+
 import pytest
-from mkdocs_translate_plugin.helpers import add_translation_notice, notice_formats
+from mkdocs_translate_plugin.helpers import (
+    add_translation_notice,
+    check_markdown_integrity,
+    chunk_markdown,
+    finalize_translation,
+    has_translatable_text,
+    iter_source_files,
+    read_markdown,
+    notice_formats,
+    protect_code_blocks,
+    restore_code_blocks,
+)
 
 
 @pytest.mark.parametrize(
@@ -80,3 +93,147 @@ def test_add_translation_notice_combined(
     else:
         # The notice must be at the very top
         assert result.startswith(expected_notice)
+
+
+def test_protect_and_restore_code_blocks_roundtrip():
+    content = "# Heading\n" + "".join(
+        f"Block {i}:\n```bash\necho {i}\n```\n" for i in range(12)
+    )
+    content_with_placeholders, code_blocks = protect_code_blocks(content)
+
+    assert len(code_blocks) == 12
+    assert "```" not in content_with_placeholders
+    assert "CODEBLOCK_11_PLACEHOLDER" in content_with_placeholders
+    assert restore_code_blocks(content_with_placeholders, code_blocks) == content
+
+
+def test_restore_code_blocks_keeps_unknown_placeholders():
+    content = "CODEBLOCK_0_PLACEHOLDER\nCODEBLOCK_5_PLACEHOLDER\n"
+    restored = restore_code_blocks(content, ["```\ncode\n```"])
+    assert restored == "```\ncode\n```\nCODEBLOCK_5_PLACEHOLDER\n"
+
+
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        ("# Heading\n", True),
+        ("---\ntitle: Test\n---\n", False),
+        ("---\ntitle: Test\n---\n\n```mermaid\ngraph TD\n```\n", False),
+        ("```bash\nls\n```\nText\n", True),
+        ("", False),
+    ],
+)
+def test_has_translatable_text(content, expected):
+    assert has_translatable_text(content) == expected
+
+
+def test_chunk_markdown():
+    section = "## Section\n" + "Some text.\n" * 10
+    fenced = "```bash\n" + "## not a heading\n" * 10 + "```\n"
+    content = "# Title\n" + section * 3 + fenced + section
+
+    assert chunk_markdown(content, max_chars=len(content)) == [content]
+
+    chunks = chunk_markdown(content, max_chars=2 * len(section))
+    assert "".join(chunks) == content
+    assert len(chunks) > 1
+    # Chunks start at headings, the fenced block is never split
+    assert all(chunk.startswith(("# ", "## ")) for chunk in chunks)
+    assert any(fenced in chunk for chunk in chunks)
+
+
+INTEGRITY_SOURCE = (
+    "# Heading\n"
+    "See [the docs](https://example.org).\n"
+    "## Usage\n"
+    "```bash\n# not a heading\necho hi\n```\n"
+)
+
+
+@pytest.mark.parametrize(
+    "translated,expect_warning",
+    [
+        # Same structure, translated text
+        (
+            "# Überschrift\n"
+            "Siehe [die Doku](https://example.org).\n"
+            "## Verwendung\n"
+            "```bash\n# not a heading\necho hi\n```\n",
+            False,
+        ),
+        # Link lost during translation
+        (
+            "# Überschrift\n"
+            "Siehe die Doku.\n"
+            "## Verwendung\n"
+            "```bash\n# not a heading\necho hi\n```\n",
+            True,
+        ),
+        # Code block fence lost during translation
+        (
+            "# Überschrift\n"
+            "Siehe [die Doku](https://example.org).\n"
+            "## Verwendung\n"
+            "```bash\n# not a heading\necho hi\n",
+            True,
+        ),
+    ],
+)
+def test_check_markdown_integrity(translated, expect_warning, caplog):
+    logger = logging.getLogger("test_check_markdown_integrity")
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        check_markdown_integrity(INTEGRITY_SOURCE, translated, logger)
+    assert ("Possible markdown corruption" in caplog.text) == expect_warning
+
+
+def test_iter_source_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in [
+        "index.en.md",
+        "index.de.md",
+        "sub/setup.en.md",
+        "sub/setup.de.md",
+        "sub/logo.png",
+    ]:
+        (tmp_path / name).write_text("")
+
+    source_files = sorted(iter_source_files(tmp_path, ".en.md"))
+    assert source_files == [tmp_path / "index.en.md", tmp_path / "sub/setup.en.md"]
+
+
+def test_read_markdown_normalizes_line_endings(tmp_path):
+    filepath = tmp_path / "index.en.md"
+    filepath.write_bytes("# Überschrift\r\n\r\n```bash\r\nls\r\n```\r\n".encode())
+
+    assert read_markdown(filepath) == "# Überschrift\n\n```bash\nls\n```\n"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "---\ntitle: Test\n---\n# Heading\nSome content.",
+        "---\ntitle: Test\n---\nSome content without heading.",
+        "Just some content.",
+        "Just some content.\n# A heading in the middle of nowhere\nMore content.",
+        "## Level 2\n# \n#NoSpace\n# Level 1 [link](https://example.org)\nText",
+        "Text\n# Heading without line break",
+    ],
+)
+def test_finalize_translation_matches_add_translation_notice(content, caplog):
+    logger = logging.getLogger("test_finalize_translation")
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        result = finalize_translation(content, content, "en", "de", "material", logger)
+
+    assert result == add_translation_notice(content, "en", "de", "material")
+    assert "Possible markdown corruption" not in caplog.text
+
+
+def test_finalize_translation_with_changed_markup(caplog):
+    source = "Intro\n# Heading\nSee [the docs](https://example.org).\n"
+    translated = "Einleitung\n# Überschrift\nSiehe die Doku.\n"
+    logger = logging.getLogger("test_finalize_translation")
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        result = finalize_translation(source, translated, "en", "de", "mkdocs", logger)
+
+    assert result == add_translation_notice(translated, "en", "de", "mkdocs")
+    assert "Possible markdown corruption" in caplog.text
@@ -0,0 +1,21 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: MIT
+
+from types import SimpleNamespace
+
+import pytest
+from mkdocs.exceptions import PluginError
+from mkdocs_translate_plugin.plugin import TranslatePlugin
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"max_concurrency": -1}, {"requests_per_minute": -1}],
+)
+def test_on_config_rejects_negative_limits(options):
+    plugin = TranslatePlugin()
+    plugin.load_config({"translation_service": "saia", **options})
+
+    with pytest.raises(PluginError, match="must not be negative"):
+        plugin.on_config(SimpleNamespace(theme=SimpleNamespace(name="material")))
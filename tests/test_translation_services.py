@@ -0,0 +1,399 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import threading
+from types import SimpleNamespace
+
+import pytest
+import mkdocs_translate_plugin.translation_services as translation_services
+from mkdocs_translate_plugin.translation_services import (
+    TranslationCache,
+    TranslationJob,
+    deepl,
+    limits,
+    saia,
+    translate_batch,
+    translate_content,
+    translate_many,
+)
+
+
+logger = logging.getLogger("mkdocs_translate_plugin")
+
+
+def make_config(**options):
+    defaults = {
+        "translation_service": "saia",
+        "translation_service_api_key": "",
+        "max_concurrency": 4,
+        "requests_per_minute": 0,
+    }
+    return SimpleNamespace(**{**defaults, **options})
+
+
+class FakeClient:
+    """
+    Stand-in for the OpenAI client, streaming the content of each prompt back
+    as its translation, transformed by the given function.
+    """
+
+    def __init__(self, transform=str.upper):
+        self.transform = transform
+        self.prompts = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, stream, **kwargs):
+        content = messages[-1]["content"].split(":\n\n", 1)[1]
+        with self._lock:
+            self.prompts.append(content)
+
+        translated = self.transform(content)
+        # Like the API, start with a chunk without choices
+        yield SimpleNamespace(choices=[])
+        for start in range(0, len(translated), 100):
+            delta = SimpleNamespace(content=translated[start : start + 100])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(saia, "_get_client", lambda config: client)
+    return client
+
+
+@pytest.mark.parametrize(
+    "translated_text,expected",
+    [
+        ("%%---DOC 1---%%\n\nEins\n\n%%---DOC 2---%%\n\nZwei\n", ["Eins", "Zwei"]),
+        ("\n%%---DOC 1---%%  \nEins\n%%---DOC 2---%%\nZwei", ["Eins", "Zwei"]),
+        # Missing separator
+        ("%%---DOC 1---%%\n\nEins\n\nZwei\n", None),
+        # Reordered separators
+        ("%%---DOC 2---%%\n\nZwei\n\n%%---DOC 1---%%\n\nEins\n", None),
+        # Text before the first separator
+        ("Here you go:\n%%---DOC 1---%%\nEins\n%%---DOC 2---%%\nZwei\n", None),
+        # Separator not on its own line
+        ("%%---DOC 1---%% Eins\n%%---DOC 2---%%\nZwei\n", None),
+    ],
+)
+def test_split_batch_response(translated_text, expected):
+    parts = saia._split_batch_response(translated_text, 2)
+    if expected is None:
+        assert parts is None
+    else:
+        assert [part.strip() for part in parts] == expected
+
+
+def test_translate_batch_with_saia_restores_code_blocks_per_document(fake_client):
+    contents = [
+        "# First\n\n```bash\necho first\n```\n",
+        "# Second\n\nText\n\n```bash\necho second\n```\n",
+        "# Third\n",
+    ]
+    translated = saia.translate_batch_with_saia(
+        make_config(), contents, "en", "de", logger
+    )
+
+    # All documents fit into one request, without their code blocks
+    assert len(fake_client.prompts) == 1
+    assert "echo" not in fake_client.prompts[0]
+    assert translated == [
+        "# FIRST\n\n```bash\necho first\n```",
+        "# SECOND\n\nTEXT\n\n```bash\necho second\n```",
+        "# THIRD",
+    ]
+
+
+def test_translate_batch_with_saia_groups_documents(fake_client):
+    # Two of these fit into one batch, three do not
+    medium = "# Medium\n\n" + "text\n" * (saia.MAX_BATCH_CHARS // 12)
+    long = "".join(
+        f"## Section {i}\n\n" + "text\n" * (saia.MAX_CHUNK_CHARS // 10) + "\n"
+        for i in range(3)
+    )
+    contents = [medium, medium, medium, long, "# Short\n"]
+
+    translated = saia.translate_batch_with_saia(
+        make_config(), contents, "en", "de", logger
+    )
+
+    # [medium, medium], [medium], chunks of long, [short]
+    batch_prompts = [p for p in fake_client.prompts if "%%---DOC" in p]
+    assert len(batch_prompts) == 1
+    assert len(fake_client.prompts) == 3 + len(
+        saia.chunk_markdown(long, saia.MAX_CHUNK_CHARS)
+    )
+    assert all(len(p) <= saia.MAX_CHUNK_CHARS + 100 for p in fake_client.prompts)
+    assert translated == [content.strip().upper() for content in contents[:3]] + [
+        long.strip().upper(),
+        "# SHORT",
+    ]
+
+
+def test_translate_batch_with_saia_falls_back_to_single_documents(fake_client):
+    # The LLM drops the document separators
+    fake_client.transform = lambda content: saia._DOC_SEPARATOR_RE.sub("", content)
+    contents = ["# One\n", "# Two\n"]
+
+    translated = saia.translate_batch_with_saia(
+        make_config(), contents, "en", "de", logger
+    )
+
+    assert len(fake_client.prompts) == 3
+    assert translated == ["# One", "# Two"]
+
+
+def test_translate_batch_with_saia_request_failure(fake_client):
+    def fail(content):
+        raise RuntimeError("API unavailable")
+
+    fake_client.transform = fail
+
+    translated = saia.translate_batch_with_saia(
+        make_config(), ["# One\n", "# Two\n"], "en", "de", logger
+    )
+
+    # A failed request is not retried document by document
+    assert len(fake_client.prompts) == 1
+    assert translated == ["", ""]
+
+
+@pytest.fixture
+def fake_deepl_requests(monkeypatch):
+    """
+    Replace the DeepL API request by one returning the HTML in upper case.
+    Returns the list of texts sent per request.
+    """
+    requests = []
+
+    def fake_request_translations(config, html_contents, source_lang, target_lang):
+        requests.append(html_contents)
+        if len(html_contents) > 1 and any("bad" in html for html in html_contents):
+            raise RuntimeError("413 Request Entity Too Large")
+        if any("fails" in html for html in html_contents):
+            raise RuntimeError("456 Quota exceeded")
+        return [html.upper() for html in html_contents]
+
+    monkeypatch.setattr(deepl, "_request_translations", fake_request_translations)
+    return requests
+
+
+def test_translate_batch_with_deepl_limits_texts_per_request(fake_deepl_requests):
+    contents = [f"Page {i}" for i in range(120)]
+
+    translated = deepl.translate_batch_with_deepl(
+        make_config(), contents, "en", "de", logger
+    )
+
+    assert [len(request) for request in fake_deepl_requests] == [50, 50, 20]
+    assert translated == [f"PAGE {i}" for i in range(120)]
+
+
+def test_translate_batch_with_deepl_limits_request_size(fake_deepl_requests):
+    # Two of these fit into one request, three do not
+    contents = ["x" * (deepl.MAX_REQUEST_BYTES // 2 - 100)] * 5
+
+    deepl.translate_batch_with_deepl(make_config(), contents, "en", "de", logger)
+
+    assert [len(request) for request in fake_deepl_requests] == [2, 2, 1]
+
+
+def test_translate_batch_with_deepl_falls_back_to_single_contents(
+    fake_deepl_requests,
+):
+    contents = ["One", "bad", "fails", "Two"]
+
+    translated = deepl.translate_batch_with_deepl(
+        make_config(), contents, "en", "de", logger
+    )
+
+    assert [len(request) for request in fake_deepl_requests] == [4, 1, 1, 1, 1]
+    assert translated == ["ONE", "BAD", "", "TWO"]
+
+
+def test_translate_batch_with_deepl_conversion_error(fake_deepl_requests, monkeypatch):
+    import markdownify
+
+    def fake_markdownify(html):
+        if "BROKEN" in html:
+            raise ValueError("Unexpected HTML")
+        return html
+
+    monkeypatch.setattr(markdownify, "markdownify", fake_markdownify)
+
+    translated = deepl.translate_batch_with_deepl(
+        make_config(), ["One", "broken", "Two"], "en", "de", logger
+    )
+
+    assert translated == ["<P>ONE</P>", "", "<P>TWO</P>"]
+
+
+def test_translation_cache_key():
+    key = TranslationCache.key("# Hello\n", "en", "de", "saia", "model-a")
+
+    assert key == TranslationCache.key("# Hello\n", "en", "de", "saia", "model-a")
+    assert key != TranslationCache.key("# Hello!\n", "en", "de", "saia", "model-a")
+    assert key != TranslationCache.key("# Hello\n", "en", "fr", "saia", "model-a")
+    assert key != TranslationCache.key("# Hello\n", "de", "de", "saia", "model-a")
+    assert key != TranslationCache.key("# Hello\n", "en", "de", "deepl", "model-a")
+    assert key != TranslationCache.key("# Hello\n", "en", "de", "saia", "model-b")
+
+
+def test_translation_cache_get_and_set(tmp_path):
+    cache = TranslationCache(tmp_path / "cache")
+    key = cache.key("# Hello\n", "en", "de", "saia", "model")
+
+    assert cache.get(key) is None
+    cache.set(key, "# Hallo\n")
+    assert cache.get(key) == "# Hallo\n"
+    # No temporary files are left behind
+    assert [path.name for path in (tmp_path / "cache").iterdir()] == [f"{key}.md"]
+
+
+def test_translate_batch_uses_cache(tmp_path, monkeypatch):
+    requested = []
+
+    def fake_translate_batch(config, contents, source_lang, target_lang, logger):
+        requested.extend(contents)
+        # "# Fails" cannot be translated
+        return ["" if "Fails" in content else content.upper() for content in contents]
+
+    monkeypatch.setattr(saia, "translate_batch_with_saia", fake_translate_batch)
+    cache = TranslationCache(tmp_path)
+    contents = ["# One\n", "# Two\n", "# Fails\n"]
+
+    first = translate_batch(make_config(), contents, "en", "de", logger, cache=cache)
+    assert first == ["# ONE\n", "# TWO\n", ""]
+    assert requested == contents
+
+    # Cache hits skip the service, the failed translation was not stored
+    requested.clear()
+    second = translate_batch(make_config(), contents, "en", "de", logger, cache=cache)
+    assert second == first
+    assert requested == ["# Fails\n"]
+
+    # Another target language is not a cache hit
+    requested.clear()
+    translate_batch(make_config(), contents[:1], "en", "fr", logger, cache=cache)
+    assert requested == ["# One\n"]
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    Replace time.monotonic() by a clock that only advances when sleeping.
+    Returns the list of requested sleep durations.
+    """
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(limits.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(limits.time, "sleep", sleep)
+    return now, sleeps
+
+
+def test_rate_limiter_sliding_window(fake_clock):
+    now, sleeps = fake_clock
+    rate_limiter = limits._RateLimiter(requests_per_minute=2)
+
+    rate_limiter.acquire()  # t=0
+    now[0] = 30
+    rate_limiter.acquire()  # t=30
+    assert sleeps == []
+
+    # Wait until the call at t=0 has left the window
+    now[0] = 45
+    rate_limiter.acquire()
+    assert sleeps == [15] and now[0] == 60
+
+    # Now the call at t=30 is the oldest one
+    rate_limiter.acquire()
+    assert sleeps == [15, 30] and now[0] == 90
+
+
+def test_cache_hits_do_not_count_against_rate_limit(tmp_path, fake_clock, monkeypatch):
+    _, sleeps = fake_clock
+    monkeypatch.setattr(limits, "_RATE_LIMITERS", {})
+    monkeypatch.setattr(saia, "_get_client", lambda config: FakeClient())
+    config = make_config(requests_per_minute=1)
+    cache = TranslationCache(tmp_path)
+    for content in ["# One\n", "# Two\n"]:
+        key = cache.key(content, "en", "de", "saia", saia.LLM)
+        cache.set(key, content.upper())
+
+    jobs = [TranslationJob([content], "en", "de") for content in ["# One\n", "# Two\n"]]
+    assert sorted(translate_many(config, jobs, logger, cache=cache)) == [
+        (0, ["# ONE\n"]),
+        (1, ["# TWO\n"]),
+    ]
+    assert sleeps == []
+
+    # Two requests to the service do hit the limit
+    translate_batch(config, ["# Three\n"], "en", "de", logger)
+    translate_batch(config, ["# Four\n"], "en", "de", logger)
+    assert sleeps == [60]
+
+
+def test_translate_many_yields_results_as_completed(monkeypatch):
+    first_job_may_finish = threading.Event()
+
+    def fake_translate_batch(
+        config, contents, source_lang, target_lang, logger, cache=None
+    ):
+        if contents == ["# First\n"]:
+            assert first_job_may_finish.wait(timeout=5)
+        return [f"{content} ({target_lang})" for content in contents]
+
+    monkeypatch.setattr(translation_services, "translate_batch", fake_translate_batch)
+    jobs = [
+        TranslationJob(["# First\n"], "en", "de"),
+        TranslationJob(["# Second\n"], "en", "fr"),
+    ]
+    results = translate_many(make_config(max_concurrency=2), jobs, logger)
+
+    # The second job is handed out while the first one is still running
+    assert next(results) == (1, ["# Second\n (fr)"])
+    first_job_may_finish.set()
+    assert list(results) == [(0, ["# First\n (de)"])]
+
+
+def test_translate_many_reports_failed_jobs(monkeypatch):
+    def fake_translate_batch(
+        config, contents, source_lang, target_lang, logger, cache=None
+    ):
+        if contents == ["# Fails\n"]:
+            raise RuntimeError("Simpleen API request failed")
+        return [content.upper() for content in contents]
+
+    monkeypatch.setattr(translation_services, "translate_batch", fake_translate_batch)
+    contents = [["# One\n"], ["# Fails\n"], ["# Two\n", "# Three\n"]]
+    jobs = [TranslationJob(job_contents, "en", "de") for job_contents in contents]
+
+    assert sorted(translate_many(make_config(), jobs, logger)) == [
+        (0, ["# ONE\n"]),
+        (1, [""]),
+        (2, ["# TWO\n", "# THREE\n"]),
+    ]
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_pages_without_translatable_text_are_not_sent(use_cache, tmp_path, fake_client):
+    cache = TranslationCache(tmp_path) if use_cache else None
+    content = "---\ntitle: API\n---\n\n```python\nprint()\n```\n"
+
+    assert (
+        translate_content(make_config(), content, "en", "de", logger, cache=cache)
+        == content
+    )
+    assert translate_batch(
+        make_config(), [content, "# Text\n"], "en", "de", logger, cache=cache
+    ) == [content, "# TEXT"]
+    assert fake_client.prompts == ["# Text\n"]